@@ -1,15 +1,21 @@
 from ipaddress import ip_address
+import atexit
+import functools
 import os
+import threading
 import json
 import requests
+from requests.adapters import HTTPAdapter
+import time
+import operator
+from collections import deque
 from datetime import datetime, timezone
-import statistics
 import dataclasses
 from typing import List, Dict, Any, Optional
 
 from src.config import settings
 from src.api.datatypes import EpisodeSession, ActionIndex
-from src.store.schema import Episode
+from src.store.schema import Episode, State
 from src.utils import _load_problem
 import logging
 
@@ -24,6 +30,45 @@ TELEMETRY_API_EPISODE_SESSION = (
 
 CODEASSIST_VERSION = os.environ.get("CODEASSIST_VERSION", "unknown")
 
+# Raw action type value -> ActionIndex, avoiding ActionIndex(value) per state
+_ACTION_VALUE_TO_ENUM = {action.value: action for action in ActionIndex}
+
+# External IP lookups are cached for an hour; (ip, monotonic time fetched).
+# Failed lookups are retried sooner, e.g. while the container network comes up.
+IP_CACHE_TTL_S = 3600
+IP_RETRY_TTL_S = 60
+_CACHED_IP: tuple[str | None, float] | None = None
+_IP_REFRESH_LOCK = threading.Lock()
+_IP_REFRESHING = False
+
+# Telemetry is fire-and-forget: events are queued and a background flusher
+# posts them one at a time over a keep-alive session, so the episode worker
+# never waits on the telemetry endpoint. The queue is bounded; when the
+# endpoint is down the oldest events are dropped.
+TELEMETRY_MAX_QUEUED_EVENTS = 1000
+# Events the flusher takes off the queue per lock hold
+TELEMETRY_MAX_EVENTS_PER_TAKE = 10
+_TELEMETRY_QUEUE: deque[bytes] = deque(maxlen=TELEMETRY_MAX_QUEUED_EVENTS)
+# Guards the queue, _TELEMETRY_DROPPED and _TELEMETRY_STOPPING; notified on
+# push and on shutdown
+_TELEMETRY_CONDITION = threading.Condition()
+# Events dropped since the queue last had room; warned about once per episode
+# of the queue being full rather than on every push
+_TELEMETRY_DROPPED = 0
+_TELEMETRY_STOPPING = False
+_TELEMETRY_FLUSHER: threading.Thread | None = None
+_TELEMETRY_FLUSHER_LOCK = threading.Lock()
+
+# Shared session so the IP lookup and telemetry posts reuse pooled connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_SESSION.headers["Connection"] = "keep-alive"
+
+# (st_mtime_ns, account address) of auth/userKeyMap.json; see get_user_id()
+_USER_ID_CACHE: tuple[int, str] | None = None
+_USER_ID_LOCK = threading.Lock()
+
 
 def _load_problem_question_id(problem_id: str) -> int | None:
     """Load the question_id (numeric ID) for a given problem_id (task_id string).
@@ -52,13 +97,75 @@ def get_system_info():
     }
 
 
-def get_ip():
-    ip = requests.get("https://icanhazip.com/", timeout=1).text
+def get_ip() -> str | None:
+    """Return the external IP address, reusing a cached lookup when fresh."""
+    if _ip_cache_is_fresh():
+        return _CACHED_IP[0]
+    return _fetch_ip()
+
+
+def _get_ip_nowait() -> str | None:
+    """Return the cached external IP without blocking.
+
+    A stale or missing entry triggers a refresh on a background thread; until
+    it lands the previous value (or None) is returned.
+    """
+    global _IP_REFRESHING
+
+    if not _ip_cache_is_fresh():
+        with _IP_REFRESH_LOCK:
+            if not _IP_REFRESHING:
+                _IP_REFRESHING = True
+                threading.Thread(
+                    target=_refresh_ip, name="telemetry-ip", daemon=True
+                ).start()
+
+    cached = _CACHED_IP
+    return cached[0] if cached is not None else None
+
+
+def _ip_cache_is_fresh() -> bool:
+    cached = _CACHED_IP
+    if cached is None:
+        return False
+    ip, fetched_at = cached
+    ttl = IP_CACHE_TTL_S if ip is not None else IP_RETRY_TTL_S
+    return time.monotonic() - fetched_at < ttl
+
+
+def _fetch_ip() -> str | None:
+    global _CACHED_IP
+
+    try:
+        ret = _SESSION.get("https://icanhazip.com/", timeout=1)
+        ret.raise_for_status()
+        # An empty body is treated as a failure so it takes the retry TTL
+        ip = ret.text.strip() or None
+    except Exception as e:
+        logger.warning(f"Error fetching external IP: {e}")
+        ip = None
+
+    _CACHED_IP = (ip, time.monotonic())
     return ip
 
 
+def _refresh_ip():
+    global _IP_REFRESHING
+
+    try:
+        _fetch_ip()
+    finally:
+        with _IP_REFRESH_LOCK:
+            _IP_REFRESHING = False
+
+
+@functools.lru_cache(maxsize=1)
 def get_accelerator_info():
-    import torch
+    # Device properties are fixed for the process lifetime; torch is optional
+    try:
+        import torch
+    except ImportError:
+        return []
 
     out_devices = []
 
@@ -82,10 +189,38 @@ def is_telemetry_disabled():
     return os.environ.get("DISABLE_TELEMETRY", "false").lower() in ("true", "1", "yes")
 
 
+# DISABLE_TELEMETRY is read once; the service is restarted to change it
+_TELEMETRY_DISABLED = is_telemetry_disabled()
+
+
+# Warm the IP cache at startup so the first event already has it
+if not _TELEMETRY_DISABLED:
+    _get_ip_nowait()
+
+
 def get_user_id() -> str:
-    with open(
-        os.path.join(settings.PERSISTENT_DATA_DIR, "auth/userKeyMap.json"), "r"
-    ) as f:
+    """Return the logged-in account address.
+
+    The web UI rewrites the auth file on login and logout, so the cached value
+    is keyed on the file's mtime and re-read whenever it changes. A missing
+    file raises, as an uncached read would.
+    """
+    global _USER_ID_CACHE
+
+    path = os.path.join(settings.PERSISTENT_DATA_DIR, "auth/userKeyMap.json")
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    with _USER_ID_LOCK:
+        if _USER_ID_CACHE is not None and _USER_ID_CACHE[0] == mtime_ns:
+            return _USER_ID_CACHE[1]
+
+        user_id = _read_user_id(path)
+        _USER_ID_CACHE = (mtime_ns, user_id)
+        return user_id
+
+
+def _read_user_id(path: str) -> str:
+    with open(path, "r") as f:
         user_key_map = json.load(f)
         keys = list(user_key_map.keys())
 
@@ -95,99 +230,224 @@ def get_user_id() -> str:
         return "unknown"
 
 
-def _is_assistant_action(action_dict: Optional[dict]) -> bool:
-    if action_dict is None:
-        return False
-    else:
-        if action_dict.get("A") is not None:
-            return True
-        else:
-            return False
-
-
 def push_telemetry_event_session(episode: Episode):
-    if is_telemetry_disabled():
+    global _TELEMETRY_DROPPED
+
+    # Bail out before any stats, user id or IP work when telemetry is off
+    if _TELEMETRY_DISABLED:
         return
 
     episode_session = convert_episode_session_to_telemetry_event(episode)
+    payload = episode_session.model_dump_json().encode()
+
+    with _TELEMETRY_CONDITION:
+        if len(_TELEMETRY_QUEUE) == TELEMETRY_MAX_QUEUED_EVENTS:
+            if _TELEMETRY_DROPPED == 0:
+                logger.warning(
+                    "Telemetry queue full (%d events), dropping oldest events",
+                    TELEMETRY_MAX_QUEUED_EVENTS,
+                )
+            _TELEMETRY_DROPPED += 1
+        _TELEMETRY_QUEUE.append(payload)
+        _TELEMETRY_CONDITION.notify()
+    _ensure_telemetry_flusher()
+
+
+def _ensure_telemetry_flusher():
+    global _TELEMETRY_FLUSHER
+
+    with _TELEMETRY_FLUSHER_LOCK:
+        if _TELEMETRY_FLUSHER is not None:
+            return
+        _TELEMETRY_FLUSHER = threading.Thread(
+            target=_run_telemetry_flusher, name="telemetry-flusher", daemon=True
+        )
+        _TELEMETRY_FLUSHER.start()
+        atexit.register(_stop_telemetry_flusher)
 
+
+def _run_telemetry_flusher():
+    """Post queued events until shutdown, sleeping while the queue is empty.
+
+    Up to TELEMETRY_MAX_EVENTS_PER_TAKE events are taken per lock hold and
+    posted sequentially outside the lock. Whatever is still queued at shutdown
+    is drained before the thread exits.
+    """
+    global _TELEMETRY_DROPPED
+
+    while True:
+        with _TELEMETRY_CONDITION:
+            while not _TELEMETRY_QUEUE and not _TELEMETRY_STOPPING:
+                _TELEMETRY_CONDITION.wait()
+            if not _TELEMETRY_QUEUE:
+                return
+            take = min(len(_TELEMETRY_QUEUE), TELEMETRY_MAX_EVENTS_PER_TAKE)
+            payloads = [_TELEMETRY_QUEUE.popleft() for _ in range(take)]
+            if _TELEMETRY_DROPPED:
+                logger.warning(
+                    "Dropped %d telemetry events while the queue was full",
+                    _TELEMETRY_DROPPED,
+                )
+                _TELEMETRY_DROPPED = 0
+
+        for payload in payloads:
+            _post_telemetry_event_session(payload)
+
+
+def _stop_telemetry_flusher():
+    global _TELEMETRY_STOPPING
+
+    with _TELEMETRY_CONDITION:
+        _TELEMETRY_STOPPING = True
+        _TELEMETRY_CONDITION.notify_all()
+    if _TELEMETRY_FLUSHER is not None:
+        _TELEMETRY_FLUSHER.join(timeout=5)
+
+
+def _post_telemetry_event_session(payload: bytes):
     try:
-        ret = requests.post(
-            TELEMETRY_API_EPISODE_SESSION, json=episode_session.model_dump(), timeout=2
+        ret = _SESSION.post(
+            TELEMETRY_API_EPISODE_SESSION,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=2,
         )
         ret.raise_for_status()
-        logger.info(f"Pushed telemetry event session: {episode_session}")
+        logger.info(f"Pushed telemetry event session: {payload.decode()}")
     except Exception as e:
         logger.error(
-            f"Error pushing telemetry event session: {e}, episode_session: {episode_session}"
+            f"Error pushing telemetry event session: {e}, "
+            f"episode_session: {payload.decode()}"
         )
 
 
-def _compute_action_statistics(episode: Episode) -> Dict[str, Any]:
-    """Compute action-related statistics from episode states."""
-    assistant_actions = {action: 0 for action in ActionIndex}
-    human_actions = {action: 0 for action in ActionIndex}
+def _compute_all_stats(sorted_states: List[State]) -> Dict[str, Any]:
+    """Compute action, regression and latency statistics in one pass over states.
+
+    Args:
+        sorted_states: The episode states, already sorted by timestep
+    """
+    # Per-actor action counts indexed by ActionIndex value (0..N-1)
+    assistant_actions = [0] * len(ActionIndex)
+    human_actions = [0] * len(ActionIndex)
 
     # Track distances for edit operations
     edit_existing_distances = []
     explain_single_distances = []
     explain_multi_distances = []
 
-    for state in episode.states:
-        if state.action is None:
+    test_regressions = 0
+    compile_regressions = 0
+    test_progressions = 0
+    compile_progressions = 0
+    latencies = []
+
+    lookup_action = _ACTION_VALUE_TO_ENUM.get
+
+    prev_compiled = None
+    prev_tests_passed = None
+    prev_ts = None
+    for i, state in enumerate(sorted_states):
+        env = state.env
+        tests = env.get("tests")
+        curr_compiled = env.get("compiled", False)
+        curr_tests_passed = tests.get("passed", 0) if tests else 0
+        curr_ts = state.timestamp_ms
+
+        if i > 0:
+            # Check compile regression/progression
+            if prev_compiled and not curr_compiled:
+                compile_regressions += 1
+            elif not prev_compiled and curr_compiled:
+                compile_progressions += 1
+
+            # Check test regression/progression
+            if curr_tests_passed < prev_tests_passed:
+                test_regressions += 1
+            elif curr_tests_passed > prev_tests_passed:
+                test_progressions += 1
+
+            # State.__post_init__ guarantees timestamp_ms is an int
+            delta = curr_ts - prev_ts
+            if delta > 0:  # Only include positive latencies
+                latencies.append(delta)
+
+        prev_compiled = curr_compiled
+        prev_tests_passed = curr_tests_passed
+        prev_ts = curr_ts
+
+        action = state.action
+        if action is None:
             continue
 
         # Determine if this is assistant or human action based on attribution
-        is_assistant = _is_assistant_action(state.action)
+        payload = action.get("A")
+        is_assistant = payload is not None
+        if not is_assistant:
+            # TODO: We will need to infer human actions in state service for this to work correctly
+            payload = action.get("H")
+            if payload is None:
+                continue
 
-        # TODO: We will need to infer human actions in state service for this to work correctly
-        action_type = (
-            state.action.get("A").get("type")
-            if is_assistant
-            else state.action.get("H").get("type")
-        )
+        action_type = payload.get("type")
 
         try:
-            action_enum = ActionIndex(action_type)
-            if is_assistant:
-                assistant_actions[action_enum] += 1
-            else:
-                human_actions[action_enum] += 1
-
-            # Calculate distances for specific action types
-            if action_enum in [
-                ActionIndex.EDIT_EXISTING_LINES,
-                ActionIndex.EXPLAIN_SINGLE_LINES,
-                ActionIndex.EXPLAIN_MULTI_LINE,
-            ]:
-                distance = _calculate_cursor_distance(state)
-                if action_enum == ActionIndex.EDIT_EXISTING_LINES:
-                    edit_existing_distances.append(distance)
-                elif action_enum == ActionIndex.EXPLAIN_SINGLE_LINES:
-                    explain_single_distances.append(distance)
-                elif action_enum == ActionIndex.EXPLAIN_MULTI_LINE:
-                    explain_multi_distances.append(distance)
-
-        except (ValueError, TypeError):
+            action_enum = lookup_action(action_type)
+        except TypeError:
+            # Unhashable action type (malformed action JSON), skip
+            continue
+        if action_enum is None:
             # Invalid action type, skip
             continue
 
+        if is_assistant:
+            assistant_actions[action_enum] += 1
+        else:
+            human_actions[action_enum] += 1
+
+        # Calculate distances for specific action types
+        if action_enum in [
+            ActionIndex.EDIT_EXISTING_LINES,
+            ActionIndex.EXPLAIN_SINGLE_LINES,
+            ActionIndex.EXPLAIN_MULTI_LINE,
+        ]:
+            distance = _calculate_cursor_distance(action, state.attribution)
+            if action_enum == ActionIndex.EDIT_EXISTING_LINES:
+                edit_existing_distances.append(distance)
+            elif action_enum == ActionIndex.EXPLAIN_SINGLE_LINES:
+                explain_single_distances.append(distance)
+            elif action_enum == ActionIndex.EXPLAIN_MULTI_LINE:
+                explain_multi_distances.append(distance)
+
+    total_transitions = max(len(sorted_states) - 1, 1)
+
+    latencies.sort()
+
     return {
         "assistant_actions": assistant_actions,
         "human_actions": human_actions,
         "edit_existing_distances": edit_existing_distances,
         "explain_single_distances": explain_single_distances,
         "explain_multi_distances": explain_multi_distances,
+        "test_regression_rate": test_regressions / total_transitions,
+        "compile_regression_rate": compile_regressions / total_transitions,
+        "test_progression_rate": test_progressions / total_transitions,
+        "compile_progression_rate": compile_progressions / total_transitions,
+        "p50_latency_ms": _compute_percentile(latencies, 50),
+        "p90_latency_ms": _compute_percentile(latencies, 90),
+        "p99_latency_ms": _compute_percentile(latencies, 99),
     }
 
 
-def _calculate_cursor_distance(state) -> float:
+def _calculate_cursor_distance(
+    action: Optional[dict], attribution: List[Dict]
+) -> float:
     """Calculate distance from cursor to the target line of an action."""
-    if not state.action:
+    if not action:
         return 0.0
 
-    target_line = state.action.get("target_line", 1)
-    cursor_line = _get_cursor_line_from_attribution(state.attribution)
+    target_line = action.get("target_line", 1)
+    cursor_line = _get_cursor_line_from_attribution(attribution)
 
     if cursor_line is None:
         return 0.0
@@ -195,115 +455,30 @@ def _calculate_cursor_distance(state) -> float:
     return abs(target_line - cursor_line)
 
 
-def _get_cursor_line_from_attribution(attribution: List[Dict]) -> int:
-    """Extract cursor line from attribution data."""
-    if not attribution:
-        return None
+def _get_cursor_line_from_attribution(attribution: List[Dict]) -> Optional[int]:
+    """Extract cursor line from attribution data.
 
+    Every line's attribution entry normally carries the cursor, so this returns
+    on the first entry; malformed entries are skipped.
+    """
     for attr in attribution:
-        if isinstance(attr, dict) and "cursor" in attr:
+        try:
             cursor_info = attr["cursor"]
-            if isinstance(cursor_info, dict) and "line" in cursor_info:
+            if "line" in cursor_info:
                 return cursor_info["line"]
-            elif isinstance(cursor_info, dict) and "char" in cursor_info:
+            if "char" in cursor_info:
                 # If we have character position, estimate line (rough approximation)
-                char_pos = cursor_info.get("char", 0)
-                return max(1, char_pos // 80)  # Assume ~80 chars per line
+                return max(1, cursor_info["char"] // 80)  # Assume ~80 chars per line
+        except (KeyError, TypeError):
+            continue
     return None
 
 
-def _compute_percentile(data: List[float], percentile: float) -> float:
-    """Compute percentile of a list of numbers."""
-    if not data:
-        return 0.0
-    try:
-        return statistics.quantiles(data, n=100)[int(percentile) - 1]
-    except (IndexError, statistics.StatisticsError):
-        return 0.0
-
-
-def _compute_regression_rates(episode: Episode) -> Dict[str, float]:
-    """Compute test and compile regression rates."""
-    if len(episode.states) < 2:
-        return {
-            "test_regression_rate": 0.0,
-            "compile_regression_rate": 0.0,
-            "test_progression_rate": 0.0,
-            "compile_progression_rate": 0.0,
-        }
-
-    test_regressions = 0
-    compile_regressions = 0
-    test_progressions = 0
-    compile_progressions = 0
-    total_transitions = 0
-
-    for i in range(1, len(episode.states)):
-        prev_state = episode.states[i - 1]
-        curr_state = episode.states[i]
-
-        prev_compiled = prev_state.env.get("compiled", False)
-        curr_compiled = curr_state.env.get("compiled", False)
-
-        prev_tests_passed = prev_state.env.get("tests", {}).get("passed", 0)
-        curr_tests_passed = curr_state.env.get("tests", {}).get("passed", 0)
-
-        # Check compile regression/progression
-        if prev_compiled and not curr_compiled:
-            compile_regressions += 1
-        elif not prev_compiled and curr_compiled:
-            compile_progressions += 1
-
-        # Check test regression/progression
-        if curr_tests_passed < prev_tests_passed:
-            test_regressions += 1
-        elif curr_tests_passed > prev_tests_passed:
-            test_progressions += 1
-
-        total_transitions += 1
-
-    return {
-        "test_regression_rate": test_regressions / max(total_transitions, 1),
-        "compile_regression_rate": compile_regressions / max(total_transitions, 1),
-        "test_progression_rate": test_progressions / max(total_transitions, 1),
-        "compile_progression_rate": compile_progressions / max(total_transitions, 1),
-    }
-
-
-def _compute_latency_stats(episode: Episode) -> Dict[str, int]:
-    """Compute latency percentiles from episode states."""
-    if len(episode.states) < 2:
-        return {
-            "p50_latency_ms": 0,
-            "p90_latency_ms": 0,
-            "p99_latency_ms": 0,
-        }
-
-    latencies = []
-    states = sorted(episode.states, key=lambda s: s.timestep)
-    for i in range(1, len(states)):
-        prev_ts = getattr(states[i - 1], "timestamp_ms", None)
-        curr_ts = getattr(states[i], "timestamp_ms", None)
-        if isinstance(prev_ts, int) and isinstance(curr_ts, int):
-            delta = curr_ts - prev_ts
-            if delta > 0:  # Only include positive latencies
-                latencies.append(delta)
-
-    if not latencies:
-        return {
-            "p50_latency_ms": 0,
-            "p90_latency_ms": 0,
-            "p99_latency_ms": 0,
-        }
-
-    latencies.sort()
-    n = len(latencies)
-
-    return {
-        "p50_latency_ms": latencies[int(n * 0.5)] if n > 0 else 0,
-        "p90_latency_ms": latencies[int(n * 0.9)] if n > 0 else 0,
-        "p99_latency_ms": latencies[int(n * 0.99)] if n > 0 else 0,
-    }
+def _compute_percentile(sorted_data: List[int], percentile: float) -> int:
+    """Return the lower nearest-rank percentile of an already sorted list."""
+    if not sorted_data:
+        return 0
+    return sorted_data[int(len(sorted_data) * percentile / 100)]
 
 
 def convert_episode_session_to_telemetry_event(episode: Episode) -> EpisodeSession:
@@ -313,15 +488,13 @@ def convert_episode_session_to_telemetry_event(episode: Episode) -> EpisodeSessi
     user_id = get_user_id()
     # Look up the numeric question_id from the dataset based on the problem_id (task_id)
     question_id = _load_problem_question_id(episode.problem_id)
-    try:
-        ip_addr = get_ip()
-    except Exception as e:
-        ip_addr = None
+    # Never block the conversion on an outbound lookup
+    ip_addr = _get_ip_nowait()
+
+    sorted_states = sorted(episode.states, key=operator.attrgetter("timestep"))
 
     # Determine success based on final state
-    final_state = (
-        max(episode.states, key=lambda s: s.timestep) if episode.states else None
-    )
+    final_state = sorted_states[-1] if sorted_states else None
     success = False
     time_to_pass = None
     turns_to_pass = None
@@ -329,30 +502,26 @@ def convert_episode_session_to_telemetry_event(episode: Episode) -> EpisodeSessi
     if final_state:
         # Success if it compiles and passes tests
         compiled = final_state.env.get("compiled", False)
-        tests_passed = final_state.env.get("tests", {}).get("passed", 0)
+        tests = final_state.env.get("tests")
+        tests_passed = tests.get("passed", 0) if tests else 0
         success = compiled and tests_passed > 0
 
         # Find when it first passed (if it did)
         # TODO: pass probably means passed all tests, this is temporary
-        for state in sorted(episode.states, key=lambda s: s.timestep):
-            if (
-                state.env.get("compiled", False)
-                and state.env.get("tests", {}).get("passed", 0) > 0
-            ):
-                time_to_pass = max(
-                    0, int(getattr(state, "timestamp_ms", 0)) - int(episode.start_time)
-                )
+        for state in sorted_states:
+            env = state.env
+            tests = env.get("tests")
+            if env.get("compiled", False) and tests and tests.get("passed", 0) > 0:
+                time_to_pass = max(0, int(state.timestamp_ms) - int(episode.start_time))
                 turns_to_pass = state.timestep
                 break
 
     # Compute all statistics
-    action_stats = _compute_action_statistics(episode)
-    regression_rates = _compute_regression_rates(episode)
-    latency_stats = _compute_latency_stats(episode)
+    stats = _compute_all_stats(sorted_states)
 
     # Extract action counts
-    assistant_actions = action_stats["assistant_actions"]
-    human_actions = action_stats["human_actions"]
+    assistant_actions = stats["assistant_actions"]
+    human_actions = stats["human_actions"]
 
     return EpisodeSession(
         timestamp=timestamp,
@@ -365,13 +534,13 @@ def convert_episode_session_to_telemetry_event(episode: Episode) -> EpisodeSessi
         success=success,
         time_to_pass=time_to_pass,
         turns_to_pass=turns_to_pass,
-        test_regression_rate=regression_rates["test_regression_rate"],
-        compile_regression_rate=regression_rates["compile_regression_rate"],
-        test_progression_rate=regression_rates["test_progression_rate"],
-        compile_progression_rate=regression_rates["compile_progression_rate"],
-        p50_latency_ms=latency_stats["p50_latency_ms"],
-        p90_latency_ms=latency_stats["p90_latency_ms"],
-        p99_latency_ms=latency_stats["p99_latency_ms"],
+        test_regression_rate=stats["test_regression_rate"],
+        compile_regression_rate=stats["compile_regression_rate"],
+        test_progression_rate=stats["test_progression_rate"],
+        compile_progression_rate=stats["compile_progression_rate"],
+        p50_latency_ms=stats["p50_latency_ms"],
+        p90_latency_ms=stats["p90_latency_ms"],
+        p99_latency_ms=stats["p99_latency_ms"],
         assistant_noop_count=assistant_actions[ActionIndex.NO_OP],
         assistant_fill_partial_count=assistant_actions[ActionIndex.FILL_PARTIAL_LINE],
         assistant_write_single_count=assistant_actions[
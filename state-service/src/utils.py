@@ -2,8 +2,8 @@ from datetime import datetime
 import json
 from pathlib import Path
 
-# Cache for loaded datasets
-_DATASET_CACHE = {}
+# Cache of dataset problems keyed by task_id, built on first lookup
+_PROBLEM_INDEX: dict[str, dict] | None = None
 
 
 def create_health_response(status, ollama_healthy, model_available, model_info=None):
@@ -38,6 +38,24 @@ def _datasets_dir() -> Path:
     return _repo_root_dir() / "datasets"
 
 
+def _problem_index() -> dict[str, dict]:
+    """Parse the datasets once and index every problem by task_id."""
+    global _PROBLEM_INDEX
+
+    if _PROBLEM_INDEX is None:
+        index = {}
+        # Search easy->medium->hard; the first occurrence of a task_id wins
+        for d in ("easy", "medium", "hard"):
+            path = _datasets_dir() / f"leetcode_{d}_problems.json"
+            if not path.exists():
+                continue
+            with path.open() as f:
+                for p in json.load(f):
+                    index.setdefault(p.get("task_id"), p)
+        _PROBLEM_INDEX = index
+    return _PROBLEM_INDEX
+
+
 def _load_problem(problem_id: str) -> dict | None:
     """Load a problem from the dataset by task_id.
 
@@ -47,17 +65,4 @@ def _load_problem(problem_id: str) -> dict | None:
     Returns:
         The problem dictionary if found, None otherwise
     """
-    # Search easy->medium->hard for the problem id
-    for d in ("easy", "medium", "hard"):
-        key = f"leetcode_{d}_problems.json"
-        path = _datasets_dir() / key
-        if not path.exists():
-            continue
-        problems = _DATASET_CACHE.get(key)
-        if problems is None:
-            problems = json.load(path.open())
-            _DATASET_CACHE[key] = problems
-        for p in problems:
-            if p.get("task_id") == problem_id:
-                return p
-    return None
+    return _problem_index().get(problem_id)
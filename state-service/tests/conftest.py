@@ -0,0 +1,15 @@
+import os
+
+# src.telemetry reads DISABLE_TELEMETRY once at import and, when enabled, starts
+# a background external IP lookup. Import it here with telemetry disabled so no
+# test module triggers network access, then restore the environment so the rest
+# of the session (and any subprocesses) see it unchanged.
+_previous = os.environ.get("DISABLE_TELEMETRY")
+os.environ["DISABLE_TELEMETRY"] = "true"
+try:
+    import src.telemetry  # noqa: F401
+finally:
+    if _previous is None:
+        del os.environ["DISABLE_TELEMETRY"]
+    else:
+        os.environ["DISABLE_TELEMETRY"] = _previous
@@ -0,0 +1,405 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+from src import telemetry, utils
+from src.api.datatypes import ActionIndex
+from src.store.schema import Episode, State
+from src.telemetry import (
+    _compute_all_stats,
+    _get_cursor_line_from_attribution,
+    _get_ip_nowait,
+    convert_episode_session_to_telemetry_event,
+    get_ip,
+    get_user_id,
+    push_telemetry_event_session,
+)
+from src.utils import _problem_index
+
+
+def make_state(timestep, timestamp_ms, compiled, passed, action=None, attribution=None):
+    return State(
+        episode_id="ep-1",
+        timestep=timestep,
+        timestamp_ms=timestamp_ms,
+        text="",
+        attribution=attribution or [],
+        action=action,
+        env={"compiled": compiled, "tests": {"passed": passed, "total": 3}},
+    )
+
+
+def make_states():
+    return [
+        make_state(0, 1000, False, 0),
+        make_state(1, 1100, True, 1, {"A": {"type": 1}}),
+        make_state(2, 1300, False, 0, {"H": {"type": 0}}),
+        # Same timestamp as the previous state: the zero latency is ignored
+        make_state(
+            3,
+            1300,
+            True,
+            2,
+            {"A": {"type": 4}, "target_line": 10},
+            [{"cursor": {"turn": 3, "char": 240}}],
+        ),
+        # Unknown action types are skipped
+        make_state(4, 1700, True, 1, {"A": {"type": 99}}),
+    ]
+
+
+def test_compute_all_stats_fixed_episode():
+    stats = _compute_all_stats(make_states())
+
+    assert stats["assistant_actions"][ActionIndex.FILL_PARTIAL_LINE] == 1
+    assert stats["assistant_actions"][ActionIndex.EDIT_EXISTING_LINES] == 1
+    assert sum(stats["assistant_actions"]) == 2
+    assert stats["human_actions"][ActionIndex.NO_OP] == 1
+    assert sum(stats["human_actions"]) == 1
+    assert stats["edit_existing_distances"] == [7]
+
+    # 4 transitions; compile F->T, T->F, F->T, T->T
+    assert stats["compile_regression_rate"] == pytest.approx(1 / 4)
+    assert stats["compile_progression_rate"] == pytest.approx(2 / 4)
+    # tests passed 0 -> 1 -> 0 -> 2 -> 1
+    assert stats["test_regression_rate"] == pytest.approx(2 / 4)
+    assert stats["test_progression_rate"] == pytest.approx(2 / 4)
+
+    # Positive latencies are [100, 200, 400]
+    assert stats["p50_latency_ms"] == 200
+    assert stats["p90_latency_ms"] == 400
+    assert stats["p99_latency_ms"] == 400
+
+
+def test_compute_all_stats_short_episodes():
+    for states in ([], [make_state(0, 1000, True, 1)]):
+        stats = _compute_all_stats(states)
+        assert stats["test_regression_rate"] == 0.0
+        assert stats["compile_progression_rate"] == 0.0
+        assert stats["p50_latency_ms"] == 0
+        assert stats["p99_latency_ms"] == 0
+
+
+class FakeResponse:
+    def __init__(self, text="", status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise telemetry.requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeSession:
+    """Stands in for telemetry._SESSION, recording posts in order and answering
+    GETs from a scripted list of responses (or exceptions to raise)."""
+
+    def __init__(self):
+        self.posted = []
+        self.post_entered = threading.Event()
+        self.release_post = threading.Event()
+        self.release_post.set()
+        self.responses = []
+        self.gets = 0
+        self.get_entered = threading.Event()
+        self.release_get = threading.Event()
+        self.release_get.set()
+
+    def get(self, url, timeout=None):
+        self.gets += 1
+        self.get_entered.set()
+        self.release_get.wait(timeout=5)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.post_entered.set()
+        self.release_post.wait(timeout=5)
+        self.posted.append(data)
+        return FakeResponse()
+
+
+class FakeEpisodeSession:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def model_dump_json(self):
+        return self.payload
+
+
+@pytest.fixture
+def telemetry_queue(monkeypatch):
+    """Fresh telemetry queue and flusher state with a 3-event cap."""
+    session = FakeSession()
+    monkeypatch.setattr(telemetry, "_SESSION", session)
+    monkeypatch.setattr(telemetry, "_TELEMETRY_DISABLED", False)
+    monkeypatch.setattr(telemetry, "TELEMETRY_MAX_QUEUED_EVENTS", 3)
+    monkeypatch.setattr(telemetry, "_TELEMETRY_QUEUE", deque(maxlen=3))
+    monkeypatch.setattr(telemetry, "_TELEMETRY_DROPPED", 0)
+    monkeypatch.setattr(telemetry, "_TELEMETRY_STOPPING", False)
+    monkeypatch.setattr(telemetry, "_TELEMETRY_FLUSHER", None)
+    monkeypatch.setattr(
+        telemetry, "convert_episode_session_to_telemetry_event", FakeEpisodeSession
+    )
+    yield session
+    telemetry._stop_telemetry_flusher()
+
+
+def test_push_drops_oldest_event_when_queue_full(telemetry_queue, monkeypatch, caplog):
+    # No flusher thread: events stay queued
+    monkeypatch.setattr(telemetry, "_ensure_telemetry_flusher", lambda: None)
+
+    with caplog.at_level(logging.WARNING, logger="src.telemetry"):
+        for payload in ("0", "1", "2", "3", "4"):
+            push_telemetry_event_session(payload)
+
+    assert list(telemetry._TELEMETRY_QUEUE) == [b"2", b"3", b"4"]
+    assert telemetry._TELEMETRY_DROPPED == 2
+    # Warned once on becoming full, not on every dropped push
+    assert ["queue full" in r.getMessage() for r in caplog.records] == [True]
+
+
+def test_push_wakes_flusher(telemetry_queue):
+    push_telemetry_event_session("a")
+
+    assert telemetry_queue.post_entered.wait(timeout=5)
+    telemetry._stop_telemetry_flusher()
+    assert telemetry_queue.posted == [b"a"]
+
+
+def test_stop_drains_queued_events(telemetry_queue):
+    telemetry_queue.release_post.clear()
+    push_telemetry_event_session("a")
+    # The flusher has taken "a" and is blocked posting it
+    assert telemetry_queue.post_entered.wait(timeout=5)
+    push_telemetry_event_session("b")
+    push_telemetry_event_session("c")
+
+    stopper = threading.Thread(target=telemetry._stop_telemetry_flusher)
+    stopper.start()
+    telemetry_queue.release_post.set()
+    stopper.join(timeout=10)
+
+    assert telemetry_queue.posted == [b"a", b"b", b"c"]
+    assert not telemetry._TELEMETRY_FLUSHER.is_alive()
+
+
+def write_user_key_map(path, account_address, mtime_s):
+    path.write_text(json.dumps({"key": {"user": {"accountAddress": account_address}}}))
+    os.utime(path, ns=(mtime_s * 10**9, mtime_s * 10**9))
+
+
+def test_get_user_id_rereads_auth_file_when_it_changes(monkeypatch, tmp_path):
+    monkeypatch.setattr(telemetry.settings, "PERSISTENT_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(telemetry, "_USER_ID_CACHE", None)
+    path = tmp_path / "auth" / "userKeyMap.json"
+    path.parent.mkdir()
+
+    write_user_key_map(path, "0xaaa", mtime_s=1_000)
+    assert get_user_id() == "0xaaa"
+
+    # Same mtime: the cached address is served without re-reading
+    write_user_key_map(path, "0xbbb", mtime_s=1_000)
+    assert get_user_id() == "0xaaa"
+
+    # A login/logout rewrite bumps the mtime and is picked up
+    write_user_key_map(path, "0xbbb", mtime_s=2_000)
+    assert get_user_id() == "0xbbb"
+
+    path.unlink()
+    with pytest.raises(FileNotFoundError):
+        get_user_id()
+
+
+def test_convert_episode_sorts_states_by_timestep(monkeypatch):
+    monkeypatch.setattr(telemetry, "get_user_id", lambda: "user-1")
+    monkeypatch.setattr(telemetry, "_load_problem_question_id", lambda _: 1)
+    monkeypatch.setattr(telemetry, "_get_ip_nowait", lambda: None)
+
+    states = make_states()
+    random.Random(0).shuffle(states)
+    episode = Episode("ep-1", "two-sum", "model", 1000, 2000, states)
+
+    session = convert_episode_session_to_telemetry_event(episode)
+
+    assert session.total_turns == 5
+    assert session.success is True
+    assert session.time_to_pass == 100
+    assert session.turns_to_pass == 1
+    assert session.compile_regression_rate == pytest.approx(1 / 4)
+    assert session.test_progression_rate == pytest.approx(2 / 4)
+    assert session.p50_latency_ms == 200
+    assert session.assistant_fill_partial_count == 1
+    assert session.assistant_edit_existing_count == 1
+    assert session.human_noop_count == 1
+
+
+@pytest.mark.parametrize("action_type", [[1], {"type": 1}])
+def test_compute_all_stats_skips_unhashable_action_types(action_type):
+    states = [
+        make_state(0, 1000, True, 1, {"A": {"type": action_type}}),
+        make_state(1, 1100, True, 1, {"A": {"type": 1}}),
+    ]
+
+    stats = _compute_all_stats(states)
+
+    assert stats["assistant_actions"][ActionIndex.FILL_PARTIAL_LINE] == 1
+    assert sum(stats["assistant_actions"]) == 1
+
+
+@pytest.mark.parametrize(
+    "attribution, expected",
+    [
+        ([], None),
+        (["not-a-dict", None, 5], None),
+        ([{"human": {}}, {"cursor": 5}, {"cursor": ["line"]}], None),
+        ([{"cursor": {"turn": 1}}], None),
+        ([{"cursor": {"char": None}}, {"cursor": {"char": 160}}], 2),
+        ([{"cursor": {"char": 10}}], 1),
+        ([{"cursor": {"line": 7, "char": 800}}], 7),
+        (["junk", {"cursor": "line"}, {"cursor": {"line": 3}}], 3),
+    ],
+)
+def test_get_cursor_line_from_attribution_skips_malformed(attribution, expected):
+    assert _get_cursor_line_from_attribution(attribution) == expected
+
+
+def write_dataset(path, difficulty, problems):
+    (path / f"leetcode_{difficulty}_problems.json").write_text(json.dumps(problems))
+
+
+def test_problem_index_prefers_first_occurrence(monkeypatch, tmp_path):
+    write_dataset(
+        tmp_path, "easy", [{"task_id": "a", "src": "easy"}, {"task_id": "dup-eh"}]
+    )
+    write_dataset(
+        tmp_path,
+        "medium",
+        [{"task_id": "dup-mh", "src": "medium"}, {"task_id": "a", "src": "medium"}],
+    )
+    write_dataset(
+        tmp_path,
+        "hard",
+        [
+            {"task_id": "dup-mh", "src": "hard"},
+            {"task_id": "dup-eh", "src": "hard"},
+            {"task_id": "h", "src": "hard"},
+        ],
+    )
+    monkeypatch.setattr(utils, "_datasets_dir", lambda: tmp_path)
+    monkeypatch.setattr(utils, "_PROBLEM_INDEX", None)
+
+    index = _problem_index()
+
+    assert index["a"]["src"] == "easy"
+    assert "src" not in index["dup-eh"]
+    assert index["dup-mh"]["src"] == "medium"
+    assert index["h"]["src"] == "hard"
+    assert utils._load_problem("missing") is None
+
+
+def test_problem_index_skips_missing_dataset_files(monkeypatch, tmp_path):
+    write_dataset(tmp_path, "hard", [{"task_id": "h", "src": "hard"}])
+    monkeypatch.setattr(utils, "_datasets_dir", lambda: tmp_path)
+    monkeypatch.setattr(utils, "_PROBLEM_INDEX", None)
+
+    assert utils._load_problem("h") == {"task_id": "h", "src": "hard"}
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for condition"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def ip_cache(monkeypatch):
+    """Empty IP cache with a fake session and a controllable clock."""
+    session = FakeSession()
+    clock = SimpleNamespace(now=10_000.0)
+    monkeypatch.setattr(telemetry, "_SESSION", session)
+    monkeypatch.setattr(telemetry, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(telemetry, "_CACHED_IP", None)
+    monkeypatch.setattr(telemetry, "_IP_REFRESHING", False)
+    yield session, clock
+    # Let any background refresh finish before the patches are undone
+    session.release_get.set()
+    wait_for(lambda: not telemetry._IP_REFRESHING)
+
+
+def test_get_ip_caches_stripped_ip_for_success_ttl(ip_cache):
+    session, clock = ip_cache
+    session.responses = [FakeResponse("1.2.3.4\n"), FakeResponse("5.6.7.8\n")]
+
+    assert get_ip() == "1.2.3.4"
+    clock.now += telemetry.IP_CACHE_TTL_S - 1
+    assert get_ip() == "1.2.3.4"
+    assert session.gets == 1
+
+    clock.now += 2
+    assert get_ip() == "5.6.7.8"
+    assert session.gets == 2
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [
+        FakeResponse("<html>503 Service Unavailable</html>", status_code=503),
+        FakeResponse(" \n"),
+        ConnectionError("network unreachable"),
+    ],
+)
+def test_get_ip_caches_failures_as_none_for_retry_ttl(ip_cache, failure):
+    session, clock = ip_cache
+    session.responses = [failure, FakeResponse("1.2.3.4\n")]
+
+    assert get_ip() is None
+    clock.now += telemetry.IP_RETRY_TTL_S - 1
+    assert get_ip() is None
+    assert session.gets == 1
+
+    clock.now += 2
+    assert get_ip() == "1.2.3.4"
+    assert session.gets == 2
+
+
+def test_get_ip_nowait_runs_a_single_background_refresh(ip_cache):
+    session, _ = ip_cache
+    session.responses = [FakeResponse("1.2.3.4\n")]
+    session.release_get.clear()
+
+    assert _get_ip_nowait() is None
+    assert session.get_entered.wait(timeout=5)
+    # Further calls while the lookup is in flight neither block nor start another
+    assert _get_ip_nowait() is None
+    assert _get_ip_nowait() is None
+
+    session.release_get.set()
+    wait_for(lambda: not telemetry._IP_REFRESHING)
+    assert _get_ip_nowait() == "1.2.3.4"
+    assert session.gets == 1
+
+
+def test_get_ip_nowait_serves_stale_ip_while_refreshing(ip_cache):
+    session, clock = ip_cache
+    session.responses = [FakeResponse("5.6.7.8\n")]
+    session.release_get.clear()
+    # The fixture restores _CACHED_IP afterwards
+    telemetry._CACHED_IP = ("1.2.3.4", clock.now - telemetry.IP_CACHE_TTL_S)
+
+    assert _get_ip_nowait() == "1.2.3.4"
+
+    session.release_get.set()
+    wait_for(lambda: not telemetry._IP_REFRESHING)
+    assert _get_ip_nowait() == "5.6.7.8"
+    assert session.gets == 1